@@ -11,10 +11,30 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import List, Tuple, Dict, Any, Union
+import threading
+import time
+from typing import TYPE_CHECKING, List, Tuple, Dict, Any, Union, Optional
 
-import aiohttp
-import requests
+if TYPE_CHECKING:
+    import ssl
+
+# A timeout in seconds, or a (connect, read) pair of timeouts in seconds.
+Timeout = Union[float, Tuple[Optional[float], Optional[float]], None]
+
+
+# Helpers are imported on first use to keep client startup cheap.
+_LAZY_MODULES = {
+    'AdaptiveLimiter': 'gorse.limiter',
+    'Prefetcher': 'gorse.prefetch',
+    'Replica': 'gorse.replica',
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        import importlib
+        return getattr(importlib.import_module(_LAZY_MODULES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class GorseException(Exception):
@@ -27,6 +47,15 @@ class GorseException(Exception):
         self.message = message
 
 
+class DeadlineExceeded(GorseException):
+    """
+    The deadline of a call passed before the server responded.
+    """
+
+    def __init__(self, message: str = 'deadline exceeded'):
+        super().__init__(408, message)
+
+
 class Score:
     """
     Scored item.
@@ -43,18 +72,98 @@ class Score:
         return {'Id': self.id, 'Score': self.score}
 
 
+def _timeouts(timeout: Timeout, deadline: Optional[float]) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    """
+    Split a timeout into connect and read timeouts, and cap both by the time left before the deadline.
+    :return: connect timeout, read timeout and time left before the deadline
+    """
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    if deadline is None:
+        return connect, read, None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded()
+    connect = remaining if connect is None else min(connect, remaining)
+    read = remaining if read is None else min(read, remaining)
+    return connect, read, remaining
+
+
+def _expired(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def _client_timeout(connect: Optional[float], read: Optional[float], total: Optional[float]):
+    import aiohttp
+    if (connect, read, total) == (None, None, None):
+        return aiohttp.client.DEFAULT_TIMEOUT
+    return aiohttp.ClientTimeout(total=total, sock_connect=connect, sock_read=read)
+
+
+def _client_session(verify: Union[bool, 'ssl.SSLContext']):
+    import aiohttp
+    # aiohttp verifies certificates by default, and takes False or an SSLContext otherwise.
+    connector = None if verify is True else aiohttp.TCPConnector(ssl=verify)
+    return aiohttp.ClientSession(connector=connector)
+
+
 class Gorse:
     """
     Gorse client.
+
+    Every method accepts a ``timeout`` that overrides the client timeout for that call, and an absolute ``deadline``
+    in ``time.monotonic()`` seconds. Both the timeout and the deadline bound connecting and reading. If the deadline
+    passes, ``DeadlineExceeded`` is raised, or the ``fallback`` is returned by methods that accept one.
+
+    The deadline bounds connecting and reading together, but ``requests`` cannot interrupt a response body that keeps
+    trickling in: such a call can return after the deadline, and then raises ``DeadlineExceeded`` or returns the
+    fallback. ``AsyncGorse`` enforces the deadline on the whole call.
+
+    ``requests`` is imported on the first call, and connections are pooled across calls. A client can be shared by
+    threads: they share one ``requests.Session``, so cookies set by the server are sent by every thread.
     """
 
-    def __init__(self, entry_point: str, api_key: str, timeout=None):
+    def __init__(self, entry_point: str, api_key: str, timeout: Timeout = None):
         self.entry_point = entry_point
         self.api_key = api_key
         self.timeout = timeout
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def warmup(self, timeout: Timeout = None, deadline: float = None):
+        """
+        Resolve DNS and open a pooled connection to the server before the first call.
+        """
+        import requests
+        from urllib3.util import Timeout as TransportTimeout
+        connect, read, total = _timeouts(self.timeout if timeout is None else timeout, deadline)
+        try:
+            self.__session().get(f"{self.entry_point}/api/health/live",
+                                 timeout=TransportTimeout(connect=connect, read=read, total=total)).close()
+        except requests.Timeout:
+            if _expired(deadline):
+                raise DeadlineExceeded()
+            raise
+        if _expired(deadline):
+            raise DeadlineExceeded()
+
+    def close(self):
+        """
+        Close pooled connections.
+        """
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __enter__(self) -> 'Gorse':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def insert_feedback(
-            self, feedback_type: str, user_id: str, item_id: str, timestamp: str, value: float = 0
+            self, feedback_type: str, user_id: str, item_id: str, timestamp: str, value: float = 0,
+            timeout: Timeout = None, deadline: float = None
     ) -> dict:
         """
         Insert a feedback.
@@ -71,16 +180,20 @@ class Gorse:
                     "Value": value,
                 }
             ],
+            timeout=timeout, deadline=deadline,
         )
 
-    def list_feedbacks(self, feedback_type: str, user_id: str):
+    def list_feedbacks(self, feedback_type: str, user_id: str, timeout: Timeout = None, deadline: float = None):
         """
         List feedbacks from a user.
         """
-        return self.__request("GET", f"{self.entry_point}/api/user/{user_id}/feedback/{feedback_type}")
+        return self.__request("GET", f"{self.entry_point}/api/user/{user_id}/feedback/{feedback_type}",
+                              timeout=timeout, deadline=deadline)
 
     def get_recommend(self, user_id: str, category: Union[str, List[str]] = "", n: int = 10, offset: int = 0,
-                                   write_back_type: str = None, write_back_delay: str = None) -> List[Score]:
+                                   write_back_type: str = None, write_back_delay: str = None,
+                                   timeout: Timeout = None, deadline: float = None,
+                                   fallback: List[Score] = None) -> List[Score]:
         """
         Get recommendation with scores.
         Uses X-API-Version: 2 header to return scores.
@@ -92,29 +205,50 @@ class Gorse:
             payload["write-back-type"] = write_back_type
         if write_back_delay:
             payload["write-back-delay"] = write_back_delay
-        result = self.__request("GET", f"{self.entry_point}/api/recommend/{user_id}", params=payload,
-                                headers={"X-API-Version": "2"})
+        try:
+            result = self.__request("GET", f"{self.entry_point}/api/recommend/{user_id}", params=payload,
+                                    headers={"X-API-Version": "2"}, timeout=timeout, deadline=deadline)
+        except DeadlineExceeded:
+            if fallback is None:
+                raise
+            return fallback
         return [Score.from_dict(item) for item in result]
 
-    def session_recommend(self, feedbacks: list, n: int = 10) -> list:
+    def session_recommend(self, feedbacks: list, n: int = 10, timeout: Timeout = None, deadline: float = None,
+                          fallback: list = None) -> list:
         """
         Get session recommendation.
         """
-        return self.__request("POST", f"{self.entry_point}/api/session/recommend?n={n}", json=feedbacks)
+        try:
+            return self.__request("POST", f"{self.entry_point}/api/session/recommend?n={n}", json=feedbacks,
+                                  timeout=timeout, deadline=deadline)
+        except DeadlineExceeded:
+            if fallback is None:
+                raise
+            return fallback
 
-    def get_neighbors(self, item_id: str, n: int = 10, offset: int = 0) -> List[str]:
+    def get_neighbors(self, item_id: str, n: int = 10, offset: int = 0, timeout: Timeout = None,
+                      deadline: float = None, fallback: List[str] = None) -> List[str]:
         """
         Get item neighbors.
         """
-        return self.__request("GET", f"{self.entry_point}/api/item/{item_id}/neighbors?n={n}&offset={offset}")
+        try:
+            return self.__request("GET", f"{self.entry_point}/api/item/{item_id}/neighbors?n={n}&offset={offset}",
+                                  timeout=timeout, deadline=deadline)
+        except DeadlineExceeded:
+            if fallback is None:
+                raise
+            return fallback
 
-    def insert_feedbacks(self, feedbacks: list) -> dict:
+    def insert_feedbacks(self, feedbacks: list, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Insert feedbacks.
         """
-        return self.__request("POST", f"{self.entry_point}/api/feedback", json=feedbacks)
+        return self.__request("POST", f"{self.entry_point}/api/feedback", json=feedbacks,
+                              timeout=timeout, deadline=deadline)
 
-    def get_feedbacks(self, n: int, cursor: str = '') -> Tuple[List[dict], str]:
+    def get_feedbacks(self, n: int, cursor: str = '', timeout: Timeout = None,
+                      deadline: float = None) -> Tuple[List[dict], str]:
         """
         Get feedbacks.
         :param n: number of returned feedbacks
@@ -122,28 +256,31 @@ class Gorse:
         :return: feedbacks and cursor for next page
         """
         response = self.__request(
-            "GET", f"{self.entry_point}/api/feedback", params={'n': n, 'cursor': cursor})
+            "GET", f"{self.entry_point}/api/feedback", params={'n': n, 'cursor': cursor},
+            timeout=timeout, deadline=deadline)
         return response['Feedback'], response['Cursor']
 
-    def delete_feedback(self, user_id: str, item_id: str) -> dict:
+    def delete_feedback(self, user_id: str, item_id: str, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Delete a feedback.
         """
-        return self.__request("DELETE", f"{self.entry_point}/api/feedback/{user_id}/{item_id}")
+        return self.__request("DELETE", f"{self.entry_point}/api/feedback/{user_id}/{item_id}",
+                              timeout=timeout, deadline=deadline)
 
-    def insert_item(self, item) -> dict:
+    def insert_item(self, item, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Insert an item.
         """
-        return self.__request("POST", f"{self.entry_point}/api/item", json=item)
+        return self.__request("POST", f"{self.entry_point}/api/item", json=item, timeout=timeout, deadline=deadline)
 
-    def get_item(self, item_id: str) -> dict:
+    def get_item(self, item_id: str, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Get an item.
         """
-        return self.__request("GET", f"{self.entry_point}/api/item/{item_id}")
+        return self.__request("GET", f"{self.entry_point}/api/item/{item_id}", timeout=timeout, deadline=deadline)
 
-    def get_items(self, n: int, cursor: str = '') -> Tuple[List[dict], str]:
+    def get_items(self, n: int, cursor: str = '', timeout: Timeout = None,
+                  deadline: float = None) -> Tuple[List[dict], str]:
         """
         Get items.
         :param n: number of returned items
@@ -151,10 +288,11 @@ class Gorse:
         :return: items and cursor for next page
         """
         response = self.__request(
-            "GET", f"{self.entry_point}/api/items", params={'n': n, 'cursor': cursor})
+            "GET", f"{self.entry_point}/api/items", params={'n': n, 'cursor': cursor},
+            timeout=timeout, deadline=deadline)
         return response['Items'], response['Cursor']
 
-    def search_items(self, query: str, n: int = 10) -> List[dict]:
+    def search_items(self, query: str, n: int = 10, timeout: Timeout = None, deadline: float = None) -> List[dict]:
         """
         Search items.
         :param query: search query
@@ -162,12 +300,13 @@ class Gorse:
         :return: items
         """
         response = self.__request(
-            "GET", f"{self.entry_point}/api/items", params={'q': query, 'n': n})
+            "GET", f"{self.entry_point}/api/items", params={'q': query, 'n': n}, timeout=timeout, deadline=deadline)
         return response['Items']
 
     def update_item(self, item_id: str, is_hidden: bool = None, categories: List[str] = None, labels: List[str] = None,
                     timestamp: str = None,
-                    comment: str = None) -> dict:
+                    comment: str = None,
+                    timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Update an item.
         """
@@ -177,33 +316,34 @@ class Gorse:
             "IsHidden": is_hidden,
             "Labels": labels,
             "Timestamp": timestamp
-        })
+        }, timeout=timeout, deadline=deadline)
 
-    def delete_item(self, item_id: str) -> dict:
+    def delete_item(self, item_id: str, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Delete an item.
         """
-        return self.__request("DELETE", f"{self.entry_point}/api/item/{item_id}")
+        return self.__request("DELETE", f"{self.entry_point}/api/item/{item_id}", timeout=timeout, deadline=deadline)
 
-    def insert_user(self, user) -> dict:
+    def insert_user(self, user, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Insert a user.
         """
-        return self.__request("POST", f"{self.entry_point}/api/user", json=user)
+        return self.__request("POST", f"{self.entry_point}/api/user", json=user, timeout=timeout, deadline=deadline)
 
-    def insert_users(self, users: List[dict]) -> dict:
+    def insert_users(self, users: List[dict], timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Insert users.
         """
-        return self.__request("POST", f"{self.entry_point}/api/users", json=users)
+        return self.__request("POST", f"{self.entry_point}/api/users", json=users, timeout=timeout, deadline=deadline)
 
-    def get_user(self, user_id: str) -> dict:
+    def get_user(self, user_id: str, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Get a user.
         """
-        return self.__request("GET", f"{self.entry_point}/api/user/{user_id}")
+        return self.__request("GET", f"{self.entry_point}/api/user/{user_id}", timeout=timeout, deadline=deadline)
 
-    def get_users(self, n: int, cursor: str = '') -> Tuple[List[dict], str]:
+    def get_users(self, n: int, cursor: str = '', timeout: Timeout = None,
+                  deadline: float = None) -> Tuple[List[dict], str]:
         """
         Get users.
         :param n: number of returned users
@@ -211,26 +351,46 @@ class Gorse:
         :return: users and cursor for next page
         """
         response = self.__request(
-            "GET", f"{self.entry_point}/api/users", params={'n': n, 'cursor': cursor})
+            "GET", f"{self.entry_point}/api/users", params={'n': n, 'cursor': cursor},
+            timeout=timeout, deadline=deadline)
         return response['Users'], response['Cursor']
 
-    def delete_user(self, user_id: str) -> dict:
+    def delete_user(self, user_id: str, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Delete a user.
         """
-        return self.__request("DELETE", f"{self.entry_point}/api/user/{user_id}")
+        return self.__request("DELETE", f"{self.entry_point}/api/user/{user_id}", timeout=timeout, deadline=deadline)
+
+    def __session(self):
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                self._session = requests.Session()
+            return self._session
 
-    def __request(self, method: str, url: str, params=None, json=None, headers: Dict[str, str] = None) -> dict:
+    def __request(self, method: str, url: str, params=None, json=None, headers: Dict[str, str] = None,
+                  timeout: Timeout = None, deadline: float = None) -> dict:
+        import requests
+        from urllib3.util import Timeout as TransportTimeout
         request_headers = {"X-API-Key": self.api_key}
         if headers:
             request_headers.update(headers)
-        response = requests.request(
-            method, url,
-            params=params,
-            headers=request_headers,
-            timeout=self.timeout,
-            json=json
-        )
+        connect, read, total = _timeouts(self.timeout if timeout is None else timeout, deadline)
+        try:
+            response = self.__session().request(
+                method, url,
+                params=params,
+                headers=request_headers,
+                timeout=TransportTimeout(connect=connect, read=read, total=total),
+                json=json
+            )
+        except requests.Timeout:
+            if _expired(deadline):
+                raise DeadlineExceeded()
+            raise
+        if _expired(deadline):
+            # A server trickling the body can outlast the read timeout, which restarts on every socket read.
+            raise DeadlineExceeded()
         if response.status_code == 200:
             return response.json()
         raise GorseException(response.status_code, response.text)
@@ -239,15 +399,73 @@ class Gorse:
 class AsyncGorse:
     """
     Gorse async client.
+
+    Pass ``http2=True`` to send requests through a shared ``httpx`` client that multiplexes concurrent calls over
+    HTTP/2 connections. It requires the ``http2`` extra (``pip install PyGorse[http2]``) and falls back to HTTP/1.1
+    when the server does not negotiate h2. HTTP/2 is only negotiated over TLS, so ``http2=True`` has no effect on
+    ``http://`` entry points: requests still use HTTP/1.1, over a pooled ``httpx`` client.
+
+    ``verify`` is either a bool or an ``ssl.SSLContext`` (e.g. trusting a private CA), and applies to both
+    transports.
+
+    Timeouts, deadlines and fallbacks behave as in ``Gorse``. The transport is imported on the first call. Without
+    ``warmup()``, every aiohttp call opens a new session; after it, calls share a pooled session until ``close()``.
     """
 
-    def __init__(self, entry_point: str, api_key: str, timeout=None):
+    def __init__(self, entry_point: str, api_key: str, timeout: Timeout = None, http2: bool = False,
+                 verify: Union[bool, 'ssl.SSLContext'] = True):
         self.entry_point = entry_point
         self.api_key = api_key
         self.timeout = timeout
+        self.http2 = http2
+        self.verify = verify
+        self._http2_client = None
+        self._session = None
+
+    async def warmup(self, connections: int = 1, timeout: Timeout = None, deadline: float = None):
+        """
+        Resolve DNS and open pooled connections to the server before the first call.
+        :param connections: number of connections to open concurrently
+        """
+        import asyncio
+        connect, read, total = _timeouts(self.timeout if timeout is None else timeout, deadline)
+        url = f"{self.entry_point}/api/health/live"
+        if self.http2:
+            import httpx
+            if self._http2_client is None:
+                self._http2_client = httpx.AsyncClient(http2=True, verify=self.verify)
+            pending = [self._http2_client.get(url, timeout=httpx.Timeout(read, connect=connect))
+                       for _ in range(connections)]
+        else:
+            if self._session is None:
+                self._session = _client_session(self.verify)
+
+            async def get():
+                async with self._session.get(url, timeout=_client_timeout(connect, read, total)) as response:
+                    await response.read()
+            pending = [get() for _ in range(connections)]
+        await asyncio.wait_for(asyncio.gather(*pending), total)
+
+    async def close(self):
+        """
+        Close pooled connections.
+        """
+        if self._http2_client is not None:
+            await self._http2_client.aclose()
+            self._http2_client = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> 'AsyncGorse':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
 
     async def insert_feedback(
-            self, feedback_type: str, user_id: str, item_id: str, timestamp: str
+            self, feedback_type: str, user_id: str, item_id: str, timestamp: str,
+            timeout: Timeout = None, deadline: float = None
     ) -> dict:
         """
         Insert a feedback.
@@ -263,23 +481,29 @@ class AsyncGorse:
                     "Timestamp": timestamp,
                 }
             ],
+            timeout=timeout, deadline=deadline,
         )
-    
-    async def delete_feedback(self, user_id: str, item_id: str) -> dict:
+
+    async def delete_feedback(self, user_id: str, item_id: str, timeout: Timeout = None,
+                              deadline: float = None) -> dict:
         """
         Delete a feedback.
         """
-        return await self.__request("DELETE", f"{self.entry_point}/api/feedback/{user_id}/{item_id}")
+        return await self.__request("DELETE", f"{self.entry_point}/api/feedback/{user_id}/{item_id}",
+                                    timeout=timeout, deadline=deadline)
 
-    async def list_feedbacks(self, feedback_type: str, user_id: str):
+    async def list_feedbacks(self, feedback_type: str, user_id: str, timeout: Timeout = None, deadline: float = None):
         """
         List feedbacks from a user.
         """
-        return await self.__request("GET", f"{self.entry_point}/api/user/{user_id}/feedback/{feedback_type}")
+        return await self.__request("GET", f"{self.entry_point}/api/user/{user_id}/feedback/{feedback_type}",
+                                    timeout=timeout, deadline=deadline)
 
 
     async def get_recommend(self, user_id: str, category: Union[str, List[str]] = "", n: int = 10, offset: int = 0,
-                                         write_back_type: str = None, write_back_delay: str = None) -> List[Score]:
+                                         write_back_type: str = None, write_back_delay: str = None,
+                                         timeout: Timeout = None, deadline: float = None,
+                                         fallback: List[Score] = None) -> List[Score]:
         """
         Get recommendation with scores.
         Uses X-API-Version: 2 header to return scores.
@@ -291,29 +515,51 @@ class AsyncGorse:
             payload["write-back-type"] = write_back_type
         if write_back_delay:
             payload["write-back-delay"] = write_back_delay
-        result = await self.__request("GET", f"{self.entry_point}/api/recommend/{user_id}", params=payload,
-                                      headers={"X-API-Version": "2"})
+        try:
+            result = await self.__request("GET", f"{self.entry_point}/api/recommend/{user_id}", params=payload,
+                                          headers={"X-API-Version": "2"}, timeout=timeout, deadline=deadline)
+        except DeadlineExceeded:
+            if fallback is None:
+                raise
+            return fallback
         return [Score.from_dict(item) for item in result]
 
-    async def session_recommend(self, feedbacks: list, n: int = 10) -> list:
+    async def session_recommend(self, feedbacks: list, n: int = 10, timeout: Timeout = None, deadline: float = None,
+                                fallback: list = None) -> list:
         """
         Get session recommendation.
         """
-        return await self.__request("POST", f"{self.entry_point}/api/session/recommend?n={n}", json=feedbacks)
+        try:
+            return await self.__request("POST", f"{self.entry_point}/api/session/recommend?n={n}", json=feedbacks,
+                                        timeout=timeout, deadline=deadline)
+        except DeadlineExceeded:
+            if fallback is None:
+                raise
+            return fallback
 
-    async def get_neighbors(self, item_id: str, n: int = 10, offset: int = 0) -> List[str]:
+    async def get_neighbors(self, item_id: str, n: int = 10, offset: int = 0, timeout: Timeout = None,
+                            deadline: float = None, fallback: List[str] = None) -> List[str]:
         """
         Get item neighbors.
         """
-        return await self.__request("GET", f"{self.entry_point}/api/item/{item_id}/neighbors?n={n}&offset={offset}")
+        try:
+            return await self.__request(
+                "GET", f"{self.entry_point}/api/item/{item_id}/neighbors?n={n}&offset={offset}",
+                timeout=timeout, deadline=deadline)
+        except DeadlineExceeded:
+            if fallback is None:
+                raise
+            return fallback
 
-    async def insert_feedbacks(self, feedbacks: list) -> dict:
+    async def insert_feedbacks(self, feedbacks: list, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Insert feedbacks.
         """
-        return await self.__request("POST", f"{self.entry_point}/api/feedback", json=feedbacks)
+        return await self.__request("POST", f"{self.entry_point}/api/feedback", json=feedbacks,
+                                    timeout=timeout, deadline=deadline)
 
-    async def get_feedbacks(self, n: int, cursor: str = '') -> Tuple[List[dict], str]:
+    async def get_feedbacks(self, n: int, cursor: str = '', timeout: Timeout = None,
+                            deadline: float = None) -> Tuple[List[dict], str]:
         """
         Get feedbacks.
         :param n: number of returned feedbacks
@@ -321,22 +567,26 @@ class AsyncGorse:
         :return: feedbacks and cursor for next page
         """
         response = await self.__request(
-            "GET", f"{self.entry_point}/api/feedback", params={'n': n, 'cursor': cursor})
+            "GET", f"{self.entry_point}/api/feedback", params={'n': n, 'cursor': cursor},
+            timeout=timeout, deadline=deadline)
         return response['Feedback'], response['Cursor']
 
-    async def insert_item(self, item) -> dict:
+    async def insert_item(self, item, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Insert an item.
         """
-        return await self.__request("POST", f"{self.entry_point}/api/item", json=item)
+        return await self.__request("POST", f"{self.entry_point}/api/item", json=item,
+                                    timeout=timeout, deadline=deadline)
 
-    async def get_item(self, item_id: str) -> dict:
+    async def get_item(self, item_id: str, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Get an item.
         """
-        return await self.__request("GET", f"{self.entry_point}/api/item/{item_id}")
+        return await self.__request("GET", f"{self.entry_point}/api/item/{item_id}",
+                                    timeout=timeout, deadline=deadline)
 
-    async def get_items(self, n: int, cursor: str = '') -> Tuple[List[dict], str]:
+    async def get_items(self, n: int, cursor: str = '', timeout: Timeout = None,
+                        deadline: float = None) -> Tuple[List[dict], str]:
         """
         Get items.
         :param n: number of returned items
@@ -344,10 +594,12 @@ class AsyncGorse:
         :return: items and cursor for next page
         """
         response = await self.__request(
-            "GET", f"{self.entry_point}/api/items", params={'n': n, 'cursor': cursor})
+            "GET", f"{self.entry_point}/api/items", params={'n': n, 'cursor': cursor},
+            timeout=timeout, deadline=deadline)
         return response['Items'], response['Cursor']
 
-    async def search_items(self, query: str, n: int = 10) -> List[dict]:
+    async def search_items(self, query: str, n: int = 10, timeout: Timeout = None,
+                           deadline: float = None) -> List[dict]:
         """
         Search items.
         :param query: search query
@@ -355,13 +607,14 @@ class AsyncGorse:
         :return: items
         """
         response = await self.__request(
-            "GET", f"{self.entry_point}/api/items", params={'q': query, 'n': n})
+            "GET", f"{self.entry_point}/api/items", params={'q': query, 'n': n}, timeout=timeout, deadline=deadline)
         return response['Items']
 
     async def update_item(self, item_id: str, is_hidden: bool = None, categories: List[str] = None,
                           labels: List[str] = None,
                           timestamp: str = None,
-                          comment: str = None) -> dict:
+                          comment: str = None,
+                          timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Update an item.
         """
@@ -371,33 +624,38 @@ class AsyncGorse:
             "IsHidden": is_hidden,
             "Labels": labels,
             "Timestamp": timestamp
-        })
+        }, timeout=timeout, deadline=deadline)
 
-    async def delete_item(self, item_id: str) -> dict:
+    async def delete_item(self, item_id: str, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Delete an item.
         """
-        return await self.__request("DELETE", f"{self.entry_point}/api/item/{item_id}")
+        return await self.__request("DELETE", f"{self.entry_point}/api/item/{item_id}",
+                                    timeout=timeout, deadline=deadline)
 
-    async def insert_user(self, user) -> dict:
+    async def insert_user(self, user, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Insert a user.
         """
-        return await self.__request("POST", f"{self.entry_point}/api/user", json=user)
+        return await self.__request("POST", f"{self.entry_point}/api/user", json=user,
+                                    timeout=timeout, deadline=deadline)
 
-    async def insert_users(self, users: List[dict]) -> dict:
+    async def insert_users(self, users: List[dict], timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Insert users.
         """
-        return await self.__request("POST", f"{self.entry_point}/api/users", json=users)
+        return await self.__request("POST", f"{self.entry_point}/api/users", json=users,
+                                    timeout=timeout, deadline=deadline)
 
-    async def get_user(self, user_id: str) -> dict:
+    async def get_user(self, user_id: str, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Get a user.
         """
-        return await self.__request("GET", f"{self.entry_point}/api/user/{user_id}")
+        return await self.__request("GET", f"{self.entry_point}/api/user/{user_id}",
+                                    timeout=timeout, deadline=deadline)
 
-    async def get_users(self, n: int, cursor: str = '') -> Tuple[List[dict], str]:
+    async def get_users(self, n: int, cursor: str = '', timeout: Timeout = None,
+                        deadline: float = None) -> Tuple[List[dict], str]:
         """
         Get users.
         :param n: number of returned users
@@ -405,22 +663,55 @@ class AsyncGorse:
         :return: users and cursor for next page
         """
         response = await self.__request(
-            "GET", f"{self.entry_point}/api/users", params={'n': n, 'cursor': cursor})
+            "GET", f"{self.entry_point}/api/users", params={'n': n, 'cursor': cursor},
+            timeout=timeout, deadline=deadline)
         return response['Users'], response['Cursor']
 
-    async def delete_user(self, user_id: str) -> dict:
+    async def delete_user(self, user_id: str, timeout: Timeout = None, deadline: float = None) -> dict:
         """
         Delete a user.
         """
-        return await self.__request("DELETE", f"{self.entry_point}/api/user/{user_id}")
+        return await self.__request("DELETE", f"{self.entry_point}/api/user/{user_id}",
+                                    timeout=timeout, deadline=deadline)
 
-    async def __request(self, method: str, url: str, params=None, json=None, headers: Dict[str, str] = None) -> dict:
+    async def __request(self, method: str, url: str, params=None, json=None, headers: Dict[str, str] = None,
+                        timeout: Timeout = None, deadline: float = None) -> dict:
+        import asyncio
         request_headers = {"X-API-Key": self.api_key}
         if headers:
             request_headers.update(headers)
-        async with aiohttp.ClientSession() as session:
-            async with session.request(method, url, params=params, json=json,
-                                       headers=request_headers) as response:
-                if response.status == 200:
-                    return await response.json()
-                raise GorseException(response.status, await response.text())
+        connect, read, total = _timeouts(self.timeout if timeout is None else timeout, deadline)
+        try:
+            if self.http2:
+                return await self.__request_http2(method, url, params, json, request_headers, connect, read, total)
+            session = self._session or _client_session(self.verify)
+            try:
+                async with session.request(method, url, params=params, json=json, headers=request_headers,
+                                           timeout=_client_timeout(connect, read, total)) as response:
+                    if response.status == 200:
+                        return await response.json()
+                    raise GorseException(response.status, await response.text())
+            finally:
+                if session is not self._session:
+                    await session.close()
+        except asyncio.TimeoutError:
+            if _expired(deadline):
+                raise DeadlineExceeded()
+            raise
+
+    async def __request_http2(self, method: str, url: str, params, json, headers: Dict[str, str],
+                              connect: Optional[float], read: Optional[float], total: Optional[float]) -> dict:
+        import asyncio
+        import httpx
+        if self._http2_client is None:
+            self._http2_client = httpx.AsyncClient(http2=True, verify=self.verify)
+        try:
+            # httpx has no total timeout, so the time left before the deadline bounds the whole exchange.
+            response = await asyncio.wait_for(self._http2_client.request(
+                method, url, params=params, json=json, headers=headers,
+                timeout=httpx.Timeout(read, connect=connect)), total)
+        except httpx.TimeoutException as e:
+            raise asyncio.TimeoutError() from e
+        if response.status_code == 200:
+            return response.json()
+        raise GorseException(response.status_code, response.text)
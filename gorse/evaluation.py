@@ -0,0 +1,111 @@
+# Copyright 2022 gorse Project Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Offline evaluation of recommendations against held-out feedbacks.
+
+Requires the ``evaluation`` extra (``pip install PyGorse[evaluation]``).
+"""
+import asyncio
+import time
+from itertools import chain
+from typing import TYPE_CHECKING, Dict, List
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from gorse import AsyncGorse
+    from gorse.limiter import AdaptiveLimiter
+
+
+def score(recommendations: Dict[str, List[str]], feedbacks: List[dict], k: int = 10,
+          n_items: int = None) -> Dict[str, float]:
+    """
+    Score recommendations against held-out feedbacks.
+    :param recommendations: recommended item ids per user, best first
+    :param feedbacks: held-out feedbacks with UserId and ItemId
+    :param k: cutoff of the ranking metrics
+    :param n_items: catalogue size for coverage, defaults to the number of distinct items seen
+    :return: mean precision@k, recall@k, NDCG@k over users and catalogue coverage
+    """
+    users = np.sort(np.array(list(recommendations), dtype=str))
+    ranked = [recommendations[user][:k] for user in users]
+    lengths = np.fromiter((len(items) for items in ranked), dtype=np.int64, count=len(ranked))
+    rec_items = np.array(list(chain.from_iterable(ranked)), dtype=str)
+    fb_users = np.array([fb['UserId'] for fb in feedbacks], dtype=str)
+    fb_items = np.array([fb['ItemId'] for fb in feedbacks], dtype=str)
+    vocab = np.unique(np.concatenate([rec_items, fb_items]))
+    n_users, n_vocab = len(users), len(vocab)
+
+    # Encode (user, item) pairs of recommendations as integers.
+    rec_user = np.repeat(np.arange(n_users), lengths)
+    rec_rank = np.arange(len(rec_items)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    rec_keys = rec_user * n_vocab + np.searchsorted(vocab, rec_items)
+
+    # Encode (user, item) pairs of feedbacks, ignoring users without recommendations.
+    fb_user = np.searchsorted(users, fb_users)
+    known = fb_user < n_users
+    known[known] = users[fb_user[known]] == fb_users[known]
+    truth = np.unique(fb_user[known] * n_vocab + np.searchsorted(vocab, fb_items[known]))
+    relevant = np.bincount(truth // n_vocab, minlength=n_users)
+
+    # A repeated item counts once, at its first (best) rank.
+    first = np.zeros(len(rec_keys), dtype=bool)
+    first[np.unique(rec_keys, return_index=True)[1]] = True
+    hits = first & np.isin(rec_keys, truth)
+    n_hits = np.bincount(rec_user, weights=hits, minlength=n_users)
+    dcg = np.bincount(rec_user, weights=hits / np.log2(rec_rank + 2), minlength=n_users)
+    ideal = np.concatenate([[0], np.cumsum(1 / np.log2(np.arange(k) + 2))])
+    idcg = ideal[np.minimum(relevant, k)]
+    mask = relevant > 0
+    return {
+        'precision': float(np.mean(n_hits[mask] / k)) if mask.any() else 0.0,
+        'recall': float(np.mean(n_hits[mask] / relevant[mask])) if mask.any() else 0.0,
+        'ndcg': float(np.mean(dcg[mask] / idcg[mask])) if mask.any() else 0.0,
+        'coverage': len(np.unique(rec_items)) / (n_items or n_vocab) if n_vocab else 0.0,
+    }
+
+
+async def evaluate(client: 'AsyncGorse', feedbacks: List[dict], k: int = 10, concurrency: int = 16,
+                   n_items: int = None, limiter: 'AdaptiveLimiter' = None, **kwargs) -> Dict[str, Dict[str, float]]:
+    """
+    Request recommendations for every user in held-out feedbacks and score them.
+    :param client: async client
+    :param feedbacks: held-out feedbacks with UserId and ItemId
+    :param k: number of recommended items per user
+    :param concurrency: maximum number of in-flight requests
+    :param limiter: adaptive limiter that replaces the fixed concurrency
+    :param n_items: catalogue size for coverage
+    :param kwargs: extra arguments of get_recommend, e.g. category or offset
+    :return: metrics and latency distribution in seconds
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    slot = limiter.slot if limiter is not None else lambda: semaphore
+    users = np.unique(np.array([fb['UserId'] for fb in feedbacks], dtype=str)).tolist()
+    latencies = np.zeros(len(users))
+
+    async def recommend(i: int, user_id: str) -> List[str]:
+        async with slot():
+            start = time.perf_counter()
+            result = await client.get_recommend(user_id, n=k, **kwargs)
+            latencies[i] = time.perf_counter() - start
+            return [item.id for item in result]
+
+    results = await asyncio.gather(*[recommend(i, user_id) for i, user_id in enumerate(users)])
+    if len(latencies) == 0:
+        latencies = np.zeros(1)
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return {
+        'metrics': score(dict(zip(users, results)), feedbacks, k=k, n_items=n_items),
+        'latency': {'mean': float(np.mean(latencies)), 'p50': float(p50), 'p90': float(p90), 'p99': float(p99)},
+    }
@@ -0,0 +1,99 @@
+# Copyright 2022 gorse Project Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from gorse import GorseException
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter for bulk requests.
+
+    The limit grows by one per window of ``limit`` successful calls while their latency stays within ``tolerance``
+    times the baseline latency, and is multiplied by ``backoff`` when a call is slower, fails with 408, 429 or 5xx,
+    or raises any other error such as a timeout or a refused connection. The baseline is the lowest latency of
+    successful calls, slowly drifting up so that it follows the server.
+    """
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 256, tolerance: float = 2.0,
+                 backoff: float = 0.9, drift: float = 0.01):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.drift = drift
+        self.baseline = None
+        self.in_flight = 0
+        self._limit = float(initial)
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        """
+        Current number of requests allowed in flight.
+        """
+        return int(self._limit)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold a slot while a request is in flight, and adjust the limit by its outcome.
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        start = time.perf_counter()
+        dropped, sampled = False, True
+        try:
+            yield
+        except GorseException as e:
+            dropped = e.status_code in (408, 429) or e.status_code >= 500
+            raise
+        except Exception:
+            # Timeouts and connection errors from any transport.
+            dropped = True
+            raise
+        except asyncio.CancelledError:
+            # A cancelled request says nothing about the server.
+            sampled = False
+            raise
+        finally:
+            async with self._condition:
+                if sampled:
+                    self.update(time.perf_counter() - start, dropped)
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def update(self, latency: float, dropped: bool = False):
+        """
+        Adjust the limit by a request outcome.
+        :param latency: latency of the request in seconds
+        :param dropped: whether the request timed out or was rejected by the server
+        """
+        if dropped:
+            # Rejections are often fast, so they must not lower the baseline.
+            self._limit = max(self.min_limit, self._limit * self.backoff)
+            return
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline += (latency - self.baseline) * self.drift
+        if latency > self.baseline * self.tolerance:
+            self._limit = max(self.min_limit, self._limit * self.backoff)
+        elif self.in_flight * 2 >= self._limit:
+            # Only grow while the limit is actually being used.
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
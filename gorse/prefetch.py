@@ -0,0 +1,177 @@
+# Copyright 2022 gorse Project Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from gorse import AsyncGorse, Score
+    from gorse.limiter import AdaptiveLimiter
+
+# Arguments that do not change the result, so calls with them can be served from the cache.
+_CACHEABLE_KWARGS = {'timeout', 'deadline', 'fallback'}
+
+
+class Prefetcher:
+    """
+    Background warm-up of recommendations for users that are likely to be active soon.
+
+    Hints are queued by priority (lower runs first) and fetched by at most ``concurrency`` background requests.
+    Results are cached for ``ttl`` seconds. Once more than ``foreground_limit`` interactive calls are in flight,
+    background requests are cancelled and the queue is paused until foreground traffic drops. Only calls made through
+    the prefetcher are counted: calls made on the client directly are invisible to it. An optional ``limiter``
+    further adapts the number of background requests below ``concurrency`` to the observed latency.
+    """
+
+    def __init__(self, client: 'AsyncGorse', n: int = 10, concurrency: int = 4, foreground_limit: int = 8,
+                 ttl: float = 60, max_size: int = 10000, max_pending: int = 10000, limiter: 'AdaptiveLimiter' = None):
+        self.client = client
+        self.limiter = limiter
+        self.n = n
+        self.concurrency = concurrency
+        self.foreground_limit = foreground_limit
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._queue = asyncio.PriorityQueue(max_pending)
+        self._cache: OrderedDict = OrderedDict()
+        self._sequence = itertools.count()
+        self._workers: List[asyncio.Task] = []
+        self._background: Set[asyncio.Task] = set()
+        self._pending: Set[Tuple[str, str]] = set()
+        self._foreground = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def hint_user(self, user_id: str, priority: int = 0):
+        """
+        Prefetch recommendations for a user, e.g. on login or session start.
+        """
+        self._hint(('recommend', user_id), priority)
+
+    def hint_item(self, item_id: str, priority: int = 0):
+        """
+        Prefetch neighbors of an item.
+        """
+        self._hint(('neighbors', item_id), priority)
+
+    async def get_recommend(self, user_id: str, n: int = None, **kwargs) -> List['Score']:
+        """
+        Get recommendation, served from the cache if it was prefetched.
+        """
+        return await self._get(('recommend', user_id), n, kwargs)
+
+    async def get_neighbors(self, item_id: str, n: int = None, **kwargs) -> List[dict]:
+        """
+        Get item neighbors, served from the cache if they were prefetched.
+        """
+        return await self._get(('neighbors', item_id), n, kwargs)
+
+    async def join(self):
+        """
+        Wait until all queued hints are processed.
+        """
+        await self._queue.join()
+
+    async def close(self):
+        """
+        Stop background workers and cancel background requests.
+        """
+        for task in self._workers + list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._background, return_exceptions=True)
+        self._workers.clear()
+
+    def _hint(self, key: Tuple[str, str], priority: int):
+        # Repeated hints for a key that is queued, in flight or cached are dropped.
+        if key in self._pending or self._lookup(key) is not None:
+            return
+        if not self._workers:
+            self._workers = [asyncio.ensure_future(self._work()) for _ in range(self.concurrency)]
+        try:
+            self._queue.put_nowait((priority, next(self._sequence), key))
+        except asyncio.QueueFull:
+            return
+        self._pending.add(key)
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return value
+
+    def _store(self, key: Tuple[str, str], value: Any):
+        self._cache[key] = (time.monotonic() + self.ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    async def _fetch(self, key: Tuple[str, str], n: int, **kwargs) -> Any:
+        kind, key_id = key
+        if kind == 'recommend':
+            return await self.client.get_recommend(key_id, n=n, **kwargs)
+        return await self.client.get_neighbors(key_id, n=n, **kwargs)
+
+    async def _prefetch(self, key: Tuple[str, str]) -> Any:
+        if self.limiter is None:
+            return await self._fetch(key, self.n)
+        async with self.limiter.slot():
+            return await self._fetch(key, self.n)
+
+    async def _get(self, key: Tuple[str, str], n: Optional[int], kwargs: dict) -> Any:
+        n = self.n if n is None else n
+        cacheable = n <= self.n and set(kwargs) <= _CACHEABLE_KWARGS
+        if cacheable:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value[:n]
+        self.misses += 1
+        self._foreground += 1
+        if self._foreground > self.foreground_limit:
+            self._idle.clear()
+            for task in self._background:
+                task.cancel()
+        try:
+            return await self._fetch(key, n, **kwargs)
+        finally:
+            self._foreground -= 1
+            if self._foreground <= self.foreground_limit:
+                self._idle.set()
+
+    async def _work(self):
+        while True:
+            _, _, key = await self._queue.get()
+            try:
+                await self._idle.wait()
+                if self._lookup(key) is not None:
+                    continue
+                task = asyncio.ensure_future(self._prefetch(key))
+                self._background.add(task)
+                await asyncio.wait([task])
+                self._background.discard(task)
+                # Prefetching is best effort, so cancelled or failed requests are dropped.
+                if not task.cancelled() and task.exception() is None:
+                    self._store(key, task.result())
+            finally:
+                self._pending.discard(key)
+                self._queue.task_done()
@@ -0,0 +1,109 @@
+# Copyright 2022 gorse Project Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import hashlib
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from gorse import Gorse
+
+_TABLES = {'items': 'ItemId', 'users': 'UserId'}
+
+
+class Replica:
+    """
+    Local SQLite replica of items and users.
+
+    The first refresh loads every row through the cursor endpoints. Later refreshes walk the catalogue again but only
+    rewrite rows whose timestamp or content hash changed, and delete rows that disappeared from the server.
+    """
+
+    def __init__(self, client: 'Gorse', path: str, page_size: int = 1000):
+        self.client = client
+        self.page_size = page_size
+        self.conn = sqlite3.connect(path)
+        for table in _TABLES:
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ("
+                              f"id TEXT PRIMARY KEY, timestamp TEXT, hash TEXT NOT NULL, data TEXT NOT NULL)")
+        self.conn.commit()
+
+    def refresh(self, deadline: float = None) -> Dict[str, int]:
+        """
+        Synchronize items and users with the server.
+        :param deadline: absolute deadline in time.monotonic() seconds shared by all page requests
+        :return: number of inserted, updated or deleted rows per table
+        """
+        return {
+            'items': self._sync('items', self.client.get_items, deadline),
+            'users': self._sync('users', self.client.get_users, deadline),
+        }
+
+    def get_item(self, item_id: str) -> Optional[dict]:
+        """
+        Get an item from the replica.
+        """
+        return self._get('items', item_id)
+
+    def get_user(self, user_id: str) -> Optional[dict]:
+        """
+        Get a user from the replica.
+        """
+        return self._get('users', user_id)
+
+    def close(self):
+        """
+        Close the replica database.
+        """
+        self.conn.close()
+
+    def _get(self, table: str, row_id: str) -> Optional[dict]:
+        row = self.conn.execute(f"SELECT data FROM {table} WHERE id = ?", (row_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _sync(self, table: str, fetch: Callable[..., Tuple[List[dict], str]], deadline: Optional[float]) -> int:
+        key = _TABLES[table]
+        changed = 0
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen (id TEXT PRIMARY KEY)")
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS page (id TEXT PRIMARY KEY)")
+        with self.conn:
+            self.conn.execute("DELETE FROM temp.seen")
+            for rows in self._pages(fetch, deadline):
+                self.conn.execute("DELETE FROM temp.page")
+                self.conn.executemany("INSERT OR IGNORE INTO temp.page VALUES (?)", [(row[key],) for row in rows])
+                self.conn.execute("INSERT OR IGNORE INTO temp.seen SELECT id FROM temp.page")
+                existing = dict(self.conn.execute(
+                    f"SELECT t.id, t.timestamp || ':' || t.hash FROM {table} t JOIN temp.page p ON t.id = p.id"))
+                upserts = []
+                for row in rows:
+                    data = json.dumps(row, sort_keys=True, ensure_ascii=False)
+                    digest = hashlib.sha1(data.encode()).hexdigest()
+                    timestamp = row.get('Timestamp') or ''
+                    if existing.get(row[key]) != f'{timestamp}:{digest}':
+                        upserts.append((row[key], timestamp, digest, data))
+                self.conn.executemany(f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?, ?)", upserts)
+                changed += len(upserts)
+            changed += self.conn.execute(
+                f"DELETE FROM {table} WHERE id NOT IN (SELECT id FROM temp.seen)").rowcount
+        return changed
+
+    def _pages(self, fetch: Callable[..., Tuple[List[dict], str]], deadline: Optional[float]) -> Iterator[List[dict]]:
+        # Pages are chained by cursors, so fetch the next page while the current one is being written.
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(fetch, self.page_size, '', deadline=deadline)
+            while future is not None:
+                rows, cursor = future.result()
+                future = pool.submit(fetch, self.page_size, cursor, deadline=deadline) if cursor else None
+                yield rows
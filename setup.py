@@ -11,6 +11,7 @@ setup(name='PyGorse',
       description='Python SDK for gorse recommender system',
       packages=['gorse'],
       install_requires=['requests>=2.14.0', 'aiohttp>=3.8.3'],
+      extras_require={'http2': ['httpx[http2]>=0.23.0'], 'evaluation': ['numpy>=1.21']},
       long_description=long_description,
       long_description_content_type='text/markdown'
       )
@@ -0,0 +1,116 @@
+# Copyright 2022 gorse Project Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import threading
+import unittest
+
+from gorse import AsyncGorse
+from gorse.evaluation import evaluate, score
+
+GORSE_API_KEY = 'zhenghaoz'
+
+
+class TestScore(unittest.TestCase):
+
+    def test_score(self):
+        recommendations = {
+            'a': ['1', '2', '3'],
+            'b': ['4', '5', '6'],
+            'c': ['1', '7'],
+        }
+        feedbacks = [
+            {'UserId': 'a', 'ItemId': '2'},
+            {'UserId': 'a', 'ItemId': '9'},
+            {'UserId': 'b', 'ItemId': '4'},
+            {'UserId': 'c', 'ItemId': '8'},
+            {'UserId': 'd', 'ItemId': '1'},
+        ]
+        result = score(recommendations, feedbacks, k=3, n_items=10)
+        self.assertAlmostEqual((1 / 3 + 1 / 3 + 0) / 3, result['precision'])
+        self.assertAlmostEqual((1 / 2 + 1 + 0) / 3, result['recall'])
+        ndcg_a = (1 / math.log2(3)) / (1 + 1 / math.log2(3))
+        self.assertAlmostEqual((ndcg_a + 1 + 0) / 3, result['ndcg'])
+        self.assertAlmostEqual(0.7, result['coverage'])
+
+    def test_score_duplicates(self):
+        result = score({'a': ['2', '1', '1', '1']}, [{'UserId': 'a', 'ItemId': '1'}], k=4)
+        self.assertAlmostEqual(1 / 4, result['precision'])
+        self.assertAlmostEqual(1.0, result['recall'])
+        self.assertAlmostEqual(1 / math.log2(3), result['ndcg'])
+        self.assertLessEqual(result['ndcg'], 1.0)
+
+    def test_score_empty(self):
+        result = score({}, [], k=3)
+        self.assertEqual({'precision': 0.0, 'recall': 0.0, 'ndcg': 0.0, 'coverage': 0.0}, result)
+
+
+class RecommendHandler(BaseHTTPRequestHandler):
+    """
+    Serves fixed recommendations per user, and an empty list for unknown users.
+    """
+    recommendations = {
+        'a': ['1', '2', '3'],
+        'b': ['4', '5', '6'],
+        'c': ['1', '7'],
+    }
+
+    def do_GET(self):
+        user_id = self.path.split('?')[0].rsplit('/', 1)[-1]
+        items = self.recommendations.get(user_id, [])
+        body = json.dumps([{'Id': item, 'Score': 1.0} for item in items]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestEvaluate(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), RecommendHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    async def test_evaluate(self):
+        client = AsyncGorse(f'http://127.0.0.1:{self.server.server_port}', GORSE_API_KEY)
+        feedbacks = [
+            {'UserId': 'a', 'ItemId': '2'},
+            {'UserId': 'a', 'ItemId': '9'},
+            {'UserId': 'b', 'ItemId': '4'},
+            {'UserId': 'c', 'ItemId': '8'},
+            {'UserId': 'd', 'ItemId': '1'},
+        ]
+        result = await evaluate(client, feedbacks, k=3, concurrency=2, n_items=10)
+        metrics = result['metrics']
+        self.assertAlmostEqual((1 / 3 + 1 / 3 + 0 + 0) / 4, metrics['precision'])
+        self.assertAlmostEqual((1 / 2 + 1 + 0 + 0) / 4, metrics['recall'])
+        ndcg_a = (1 / math.log2(3)) / (1 + 1 / math.log2(3))
+        self.assertAlmostEqual((ndcg_a + 1 + 0 + 0) / 4, metrics['ndcg'])
+        self.assertAlmostEqual(0.7, metrics['coverage'])
+        latency = result['latency']
+        self.assertGreater(latency['p50'], 0)
+        self.assertLessEqual(latency['p50'], latency['p90'])
+        self.assertLessEqual(latency['p90'], latency['p99'])
+        self.assertGreater(latency['mean'], 0)
@@ -12,13 +12,35 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from datetime import datetime, UTC
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import os
+import socket
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
 
-from gorse import Gorse, GorseException, AsyncGorse
+import requests
+import trustme
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+
+from gorse import Gorse, GorseException, AsyncGorse, Replica, DeadlineExceeded, Score, Prefetcher
 
 GORSE_ENDPOINT = 'http://127.0.0.1:8088'
 GORSE_API_KEY = 'zhenghaoz'
 
+logger = logging.getLogger(__name__)
+
 
 class TestGorseClient(unittest.TestCase):
 
@@ -204,6 +226,231 @@ class TestGorseClient(unittest.TestCase):
             item = client.get_item(recommendation.id)
             self.assertTrue({'Drama', 'Comedy'} & set(item['Categories']))
 
+    def test_deadline(self):
+        client = Gorse(GORSE_ENDPOINT, GORSE_API_KEY)
+        with self.assertRaises(DeadlineExceeded):
+            client.get_recommend('3000', deadline=time.monotonic())
+        fallback = [Score('1', 0)]
+        self.assertIs(fallback, client.get_recommend('3000', deadline=time.monotonic(), fallback=fallback))
+        recommendations = client.get_recommend('3000', n=3, timeout=(1, 5), deadline=time.monotonic() + 10)
+        self.assertEqual(3, len(recommendations))
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """
+    Serves an empty recommendation list slowly: /stall waits before the headers, /trickle sends the body byte by byte.
+    """
+
+    def do_GET(self):
+        body = b'[                    ]'
+        if self.path.startswith('/stall'):
+            time.sleep(1)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            for i in range(len(body)):
+                self.wfile.write(body[i:i + 1])
+                self.wfile.flush()
+                if self.path.startswith('/trickle'):
+                    time.sleep(0.05)
+        except ConnectionError:
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestDeadline(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_stall(self):
+        client = Gorse(f'http://127.0.0.1:{self.server.server_port}/stall', GORSE_API_KEY)
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            client.get_recommend('3000', deadline=start + 0.2)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual([], client.get_recommend('3000', deadline=time.monotonic() + 0.2, fallback=[]))
+
+    def test_trickle(self):
+        client = Gorse(f'http://127.0.0.1:{self.server.server_port}/trickle', GORSE_API_KEY)
+        with self.assertRaises(DeadlineExceeded):
+            client.get_recommend('3000', deadline=time.monotonic() + 0.3)
+        self.assertEqual([], client.get_recommend('3000', deadline=time.monotonic() + 0.3, fallback=[]))
+        self.assertEqual([], client.get_recommend('3000', deadline=time.monotonic() + 10))
+
+    def test_warmup(self):
+        for path in ('/stall', '/trickle'):
+            with Gorse(f'http://127.0.0.1:{self.server.server_port}{path}', GORSE_API_KEY) as client:
+                with self.assertRaises(DeadlineExceeded):
+                    client.warmup(deadline=time.monotonic() + 0.3)
+
+    def test_shared_session(self):
+        client = Gorse(f'http://127.0.0.1:{self.server.server_port}', GORSE_API_KEY)
+        with mock.patch('requests.Session', wraps=requests.Session) as session:
+            with ThreadPoolExecutor(16) as pool:
+                results = list(pool.map(client.get_recommend, [str(i) for i in range(64)]))
+        client.close()
+        self.assertEqual([[]] * 64, results)
+        self.assertEqual(1, session.call_count)
+
+    def test_async_trickle(self):
+        client = AsyncGorse(f'http://127.0.0.1:{self.server.server_port}/trickle', GORSE_API_KEY)
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            asyncio.run(client.get_recommend('3000', deadline=start + 0.3))
+        self.assertLess(time.monotonic() - start, 0.6)
+
+
+class TestHttp2(unittest.IsolatedAsyncioTestCase):
+    """
+    Runs an h2-capable TLS server locally and records the HTTP version and client connection of every request.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ca = trustme.CA()
+        cls.tmp = tempfile.TemporaryDirectory()
+        cert_path = os.path.join(cls.tmp.name, 'server.pem')
+        cls.ca.issue_cert('127.0.0.1').private_key_and_cert_chain_pem.write_to_path(cert_path)
+        cls.requests = []
+
+        async def app(scope, receive, send):
+            if scope['type'] == 'lifespan':
+                while (await receive())['type'] != 'lifespan.shutdown':
+                    await send({'type': 'lifespan.startup.complete'})
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+            cls.requests.append((scope['http_version'], scope['client']))
+            # Keep requests in flight long enough to overlap.
+            await asyncio.sleep(0.05)
+            body = json.dumps([{'Id': '315', 'Score': 1.0}]).encode()
+            await send({'type': 'http.response.start', 'status': 200,
+                        'headers': [(b'content-type', b'application/json')]})
+            await send({'type': 'http.response.body', 'body': body})
+
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        sock.listen()
+        cls.endpoint = f'https://127.0.0.1:{sock.getsockname()[1]}'
+        config = Config()
+        # The server takes ownership of the listening socket.
+        config.bind = [f'fd://{sock.detach()}']
+        config.certfile = config.keyfile = cert_path
+        config.loglevel = 'WARNING'
+        cls.loop = asyncio.new_event_loop()
+        cls.stopped = asyncio.Event()
+        cls.thread = threading.Thread(target=cls.loop.run_until_complete, daemon=True,
+                                      args=(serve(app, config, shutdown_trigger=cls.stopped.wait),))
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.call_soon_threadsafe(cls.stopped.set)
+        cls.thread.join()
+        cls.loop.close()
+        cls.tmp.cleanup()
+
+    async def test_multiplex(self):
+        self.requests.clear()
+        context = ssl.create_default_context()
+        self.ca.configure_trust(context)
+        async with AsyncGorse(self.endpoint, GORSE_API_KEY, http2=True, verify=context) as client:
+            results = await asyncio.gather(*[client.get_recommend(str(i)) for i in range(50)])
+        self.assertEqual(50, len(results))
+        self.assertEqual('315', results[0][0].id)
+        self.assertEqual(['2'] * 50, [version for version, _ in self.requests])
+        self.assertEqual(1, len({client for _, client in self.requests}))
+
+    async def test_latency(self):
+        def trust():
+            # httpx enables h2 ALPN on the context it is given, so each client gets its own.
+            context = ssl.create_default_context()
+            self.ca.configure_trust(context)
+            return context
+
+        async def measure(client):
+            async def timed(user_id):
+                start = time.perf_counter()
+                await client.get_recommend(user_id)
+                return time.perf_counter() - start
+            self.requests.clear()
+            async with client:
+                await client.warmup()
+                latencies = await asyncio.gather(*[timed(str(i)) for i in range(200)])
+            quantiles = statistics.quantiles(latencies, n=100)
+            return quantiles[49], quantiles[98], {client for _, client in self.requests}
+
+        h2_p50, h2_p99, h2_clients = await measure(
+            AsyncGorse(self.endpoint, GORSE_API_KEY, http2=True, verify=trust()))
+        h1_p50, h1_p99, h1_clients = await measure(AsyncGorse(self.endpoint, GORSE_API_KEY, verify=trust()))
+        logger.info('200 concurrent calls: HTTP/2 p50 %.1f ms, p99 %.1f ms over %d connection(s); '
+                    'HTTP/1.1 p50 %.1f ms, p99 %.1f ms over %d connections',
+                    h2_p50 * 1000, h2_p99 * 1000, len(h2_clients), h1_p50 * 1000, h1_p99 * 1000, len(h1_clients))
+        # Timings depend on the machine, so only the connection counts are asserted.
+        self.assertEqual(1, len(h2_clients))
+        self.assertGreater(len(h1_clients), 1)
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_lazy_import(self):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import gorse'],
+                                capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        # Each line of -X importtime is "import time: self [us] | cumulative | imported package".
+        modules = {line.split('|')[-1].strip(): int(line.split('|')[1]) for line in result.stderr.splitlines()
+                   if line.startswith('import time:') and line.split('|')[1].strip().isdigit()}
+        for module in ('requests', 'aiohttp', 'httpx', 'numpy'):
+            self.assertNotIn(module, modules)
+        # A generous bound that only a heavy eager import would exceed.
+        self.assertLess(modules['gorse'], 200_000)
+
+    def test_first_call(self):
+        start = time.perf_counter()
+        with Gorse(GORSE_ENDPOINT, GORSE_API_KEY) as client:
+            client.warmup()
+            warmed = time.perf_counter()
+            recommendations = client.get_recommend('3000', n=3)
+            called = time.perf_counter()
+        self.assertEqual(3, len(recommendations))
+        # Reported rather than asserted, since wall-clock timings are too noisy for CI.
+        logger.info('warmup: %.1f ms, first call: %.1f ms', (warmed - start) * 1000, (called - warmed) * 1000)
+
+
+class TestReplica(unittest.TestCase):
+
+    def test_refresh(self):
+        client = Gorse(GORSE_ENDPOINT, GORSE_API_KEY)
+        with tempfile.TemporaryDirectory() as tmp:
+            replica = Replica(client, os.path.join(tmp, 'replica.db'), page_size=100)
+            changed = replica.refresh()
+            self.assertGreater(changed['items'], 0)
+            self.assertGreater(changed['users'], 0)
+            self.assertEqual('Toy Story (1995)', replica.get_item('1')['Comment'])
+            self.assertEqual('technician', replica.get_user('1')['Labels']['occupation'])
+
+            # Unchanged rows are not rewritten.
+            self.assertEqual({'items': 0, 'users': 0}, replica.refresh())
+
+            client.insert_user({'UserId': '4000', 'Comment': 'replica'})
+            self.assertEqual({'items': 0, 'users': 1}, replica.refresh())
+            self.assertEqual('replica', replica.get_user('4000')['Comment'])
+            client.delete_user('4000')
+            self.assertEqual({'items': 0, 'users': 1}, replica.refresh())
+            self.assertIsNone(replica.get_user('4000'))
+            replica.close()
+
 
 class TestAsyncGorseClient(unittest.IsolatedAsyncioTestCase):
 
@@ -375,3 +622,118 @@ class TestAsyncGorseClient(unittest.IsolatedAsyncioTestCase):
         for recommendation in recommendations:
             item = await client.get_item(recommendation.id)
             self.assertTrue({'Drama', 'Comedy'} & set(item['Categories']))
+
+    async def test_http2_fallback(self):
+        # Plain HTTP never negotiates h2, so this goes through the HTTP/1.1 fallback.
+        async with AsyncGorse(GORSE_ENDPOINT, GORSE_API_KEY, http2=True) as client:
+            await client.insert_user({'UserId': '3000'})
+            recommendations = await client.get_recommend('3000', n=3)
+            self.assertEqual(3, len(recommendations))
+            self.assertEqual('315', recommendations[0].id)
+
+    async def test_deadline(self):
+        client = AsyncGorse(GORSE_ENDPOINT, GORSE_API_KEY)
+        with self.assertRaises(DeadlineExceeded):
+            await client.get_neighbors('1', deadline=time.monotonic())
+        self.assertEqual([], await client.get_neighbors('1', deadline=time.monotonic(), fallback=[]))
+        neighbors = await client.get_neighbors('1', 3, timeout=(1, 5), deadline=time.monotonic() + 10)
+        self.assertEqual(3, len(neighbors))
+
+    async def test_prefetch(self):
+        client = AsyncGorse(GORSE_ENDPOINT, GORSE_API_KEY)
+        await client.insert_user({'UserId': '3000'})
+        prefetcher = Prefetcher(client, n=3)
+        prefetcher.hint_user('3000')
+        prefetcher.hint_item('1')
+        await prefetcher.join()
+        recommendations = await prefetcher.get_recommend('3000', n=3)
+        self.assertEqual(['315', '1432', '918'], [r.id for r in recommendations])
+        neighbors = await prefetcher.get_neighbors('1', n=1)
+        self.assertEqual('1060', neighbors[0]['Id'])
+        self.assertEqual(2, prefetcher.hits)
+        self.assertEqual(0, prefetcher.misses)
+        await prefetcher.close()
+
+    async def test_warmup(self):
+        async with AsyncGorse(GORSE_ENDPOINT, GORSE_API_KEY) as client:
+            await client.warmup(connections=2)
+            recommendations = await client.get_recommend('3000', n=3)
+            self.assertEqual(3, len(recommendations))
+
+
+class TestPrefetcher(unittest.IsolatedAsyncioTestCase):
+
+    async def test_duplicate_hints(self):
+        calls = []
+
+        class Client:
+            async def get_recommend(self, user_id, n=10):
+                calls.append(user_id)
+                await asyncio.sleep(0.01)
+                return [Score('1', 0)]
+
+        prefetcher = Prefetcher(Client())
+        for _ in range(4):
+            prefetcher.hint_user('bob')
+        await asyncio.sleep(0)
+        # In flight now, so this is dropped as well.
+        prefetcher.hint_user('bob')
+        await prefetcher.join()
+        prefetcher.hint_user('bob')
+        await prefetcher.join()
+        self.assertEqual(['bob'], calls)
+        await prefetcher.close()
+
+    async def test_priority(self):
+        calls = []
+
+        class Client:
+            async def get_recommend(self, user_id, n=10):
+                calls.append(user_id)
+                return [Score('1', 0)]
+
+        prefetcher = Prefetcher(Client(), concurrency=1)
+        prefetcher.hint_user('carol', priority=2)
+        prefetcher.hint_user('alice', priority=0)
+        prefetcher.hint_user('bob', priority=1)
+        prefetcher.hint_user('dave', priority=1)
+        await prefetcher.join()
+        # Lower priorities first, and hints of equal priority in order.
+        self.assertEqual(['alice', 'bob', 'dave', 'carol'], calls)
+        await prefetcher.close()
+
+    async def test_foreground_limit(self):
+        calls, cancelled = [], []
+        release = asyncio.Event()
+
+        class Client:
+            async def get_recommend(self, user_id, n=10):
+                calls.append(user_id)
+                try:
+                    await release.wait()
+                except asyncio.CancelledError:
+                    cancelled.append(user_id)
+                    raise
+                return [Score('1', 0)]
+
+        prefetcher = Prefetcher(Client(), concurrency=1, foreground_limit=1)
+        prefetcher.hint_user('bob')
+        await asyncio.sleep(0.01)
+        # A second foreground call exceeds the limit and cancels the background request.
+        foreground = [asyncio.ensure_future(prefetcher.get_recommend(user_id)) for user_id in ('alice', 'carol')]
+        await asyncio.sleep(0.01)
+        self.assertEqual(['bob'], cancelled)
+        # The queue is paused while foreground traffic is above the limit.
+        prefetcher.hint_user('dave')
+        await asyncio.sleep(0.01)
+        self.assertEqual(['bob', 'alice', 'carol'], calls)
+        # It resumes once foreground traffic drops.
+        release.set()
+        await asyncio.gather(*foreground)
+        await prefetcher.join()
+        self.assertEqual(['bob', 'alice', 'carol', 'dave'], calls)
+        await prefetcher.get_recommend('dave')
+        await prefetcher.get_recommend('bob')
+        self.assertEqual(1, prefetcher.hits)
+        self.assertEqual(['bob', 'alice', 'carol', 'dave', 'bob'], calls)
+        await prefetcher.close()
@@ -0,0 +1,87 @@
+# Copyright 2022 gorse Project Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import unittest
+
+from gorse import AdaptiveLimiter, GorseException
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+
+    def test_increase(self):
+        limiter = AdaptiveLimiter(initial=4, max_limit=8)
+        limiter.in_flight = 4
+        for _ in range(100):
+            limiter.update(0.01)
+        self.assertEqual(8, limiter.limit)
+
+    def test_idle(self):
+        limiter = AdaptiveLimiter(initial=4)
+        for _ in range(100):
+            limiter.update(0.01)
+        self.assertEqual(4, limiter.limit)
+
+    def test_decrease(self):
+        limiter = AdaptiveLimiter(initial=10, backoff=0.5)
+        limiter.update(0.01)
+        limiter.update(0.1)
+        self.assertEqual(5, limiter.limit)
+        limiter.update(0.01, dropped=True)
+        self.assertEqual(2, limiter.limit)
+        for _ in range(10):
+            limiter.update(0.01, dropped=True)
+        self.assertEqual(1, limiter.limit)
+
+    def test_fast_rejection(self):
+        limiter = AdaptiveLimiter(initial=22)
+        limiter.in_flight = 22
+        limiter.update(0.05)
+        limiter.update(0.002, dropped=True)
+        self.assertEqual(0.05, limiter.baseline)
+        for _ in range(50):
+            limiter.update(0.05)
+        self.assertGreaterEqual(limiter.limit, 19)
+
+
+class TestAdaptiveLimiterSlot(unittest.IsolatedAsyncioTestCase):
+
+    async def test_limit(self):
+        limiter = AdaptiveLimiter(initial=3, max_limit=3)
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[request() for _ in range(20)])
+        self.assertEqual(3, peak)
+        self.assertEqual(0, limiter.in_flight)
+
+    async def test_rejected(self):
+        limiter = AdaptiveLimiter(initial=10, backoff=0.5)
+        for status_code, limit in ((404, 10), (429, 5), (503, 2)):
+            with self.assertRaises(GorseException):
+                async with limiter.slot():
+                    raise GorseException(status_code, '')
+            self.assertEqual(limit, limiter.limit)
+
+    async def test_connection_error(self):
+        limiter = AdaptiveLimiter(initial=8, backoff=0.5)
+        with self.assertRaises(ConnectionRefusedError):
+            async with limiter.slot():
+                raise ConnectionRefusedError()
+        self.assertEqual(4, limiter.limit)
+        self.assertIsNone(limiter.baseline)